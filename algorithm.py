@@ -23,7 +23,14 @@ from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtCore import QCoreApplication
 
 from qgis.core import QgsProcessingAlgorithm
-from iadb_toolbox.utils import PLUGIN_ROOT
+from iadb_toolbox.utils import (
+    PLUGIN_ROOT,
+    generate_batch_file,
+    sph_command,
+    execute,
+    copy_outputs,
+    cleanup_work_dir,
+)
 
 
 class IadbAlgorithm(QgsProcessingAlgorithm):
@@ -36,5 +43,21 @@ class IadbAlgorithm(QgsProcessingAlgorithm):
     def icon(self):
         return QIcon(os.path.join(PLUGIN_ROOT, "icons", "iadb.svg"))
 
+    def run_sph(self, problem_name, work_dir, output, feedback):
+        """
+        Runs the SPH tool in the given working directory, copies its outputs
+        to the output folder and schedules the working directory removal.
+        """
+        batch_file = generate_batch_file(problem_name, work_dir)
+
+        feedback.pushInfo(self.tr("Running SPH model…"))
+        execute(sph_command(batch_file), feedback)
+
+        feedback.pushInfo(self.tr("Copying output files…"))
+        copy_outputs(work_dir, problem_name, output)
+
+        feedback.pushInfo(self.tr("Cleanup…"))
+        cleanup_work_dir(work_dir)
+
     def tr(self, text):
         return QCoreApplication.translate(self.__class__.__name__, text)
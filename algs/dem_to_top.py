@@ -17,9 +17,6 @@
 ***************************************************************************
 """
 
-import os
-import shutil
-
 from qgis.core import (
     QgsProcessingException,
     QgsProcessingParameterRasterLayer,
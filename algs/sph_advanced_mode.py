@@ -18,29 +18,20 @@
 """
 
 import os
-import shutil
 
 from qgis.core import (
-    Qgis,
-    QgsProcessingException,
     QgsProcessingParameterFile,
     QgsProcessingParameterString,
     QgsProcessingParameterNumber,
-    QgsProcessingParameterRasterLayer,
     QgsProcessingParameterFolderDestination,
     QgsProcessingOutputFile,
 )
 
-from processing.core.ProcessingConfig import ProcessingConfig
-
 from iadb_toolbox.algorithm import IadbAlgorithm
 from iadb_toolbox.utils import (
-    generate_batch_file,
-    execute,
     copy_inputs,
-    generate_master_file,
-    generate_data_file,
-    copy_outputs,
+    generate_job_files,
+    preflight_check,
 )
 
 
@@ -216,14 +207,14 @@ class SphAdvancedMode(IadbAlgorithm):
         time_end = self.parameterAsInt(parameters, self.TIME_END, context)
         print_step = self.parameterAsInt(parameters, self.PRINT_STEP, context)
 
-        cgra = self.parameterAsInt(parameters, self.CGRA, context)
+        cgra = self.parameterAsDouble(parameters, self.CGRA, context)
         dens = self.parameterAsInt(parameters, self.DENS, context)
         cmanning = self.parameterAsInt(parameters, self.CMANNING, context)
         eros_coef = self.parameterAsInt(parameters, self.EROS_COEF, context)
         nfrict = self.parameterAsInt(parameters, self.NFRICT, context)
-        tauy0 = self.parameterAsInt(parameters, self.TAUY0, context)
-        visco = self.parameterAsInt(parameters, self.VISCO, context)
-        tanfi8 = self.parameterAsInt(parameters, self.TANFI8, context)
+        tauy0 = self.parameterAsDouble(parameters, self.TAUY0, context)
+        visco = self.parameterAsDouble(parameters, self.VISCO, context)
+        tanfi8 = self.parameterAsDouble(parameters, self.TANFI8, context)
 
         points_file = self.parameterAsFile(parameters, self.POINTS, context)
         dem = self.parameterAsFile(parameters, self.DEM, context)
@@ -244,23 +235,13 @@ class SphAdvancedMode(IadbAlgorithm):
             "tanfi8": tanfi8,
         }
 
+        preflight_check([points_file, dem], output)
+
         feedback.pushInfo(self.tr("Preparing inputs…"))
         work_dir = copy_inputs(problem_name, dem, points_file)
-        generate_master_file(
-            os.path.join(work_dir, f"{problem_name}.MASTER.DAT"), params
-        )
-        generate_data_file(os.path.join(work_dir, f"{problem_name}.DAT"), params)
-        batch_file = generate_batch_file(problem_name, work_dir)
-
-        feedback.pushInfo(self.tr("Running SPH model…"))
-        commands = ["cmd.exe", "/c", batch_file]
-        execute(commands, feedback)
-
-        feedback.pushInfo(self.tr("Copying output files…"))
-        copy_outputs(work_dir, problem_name, output)
+        generate_job_files(work_dir, problem_name, params)
 
-        feedback.pushInfo(self.tr("Cleanup…"))
-        shutil.rmtree(work_dir)
+        self.run_sph(problem_name, work_dir, output, feedback)
 
         return {
             self.OUTPUT: output,
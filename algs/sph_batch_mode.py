@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    sph_batch_mode.py
+    ---------------------
+    Date                 : August 2025
+    Copyright            : (C) 2025 by NaturalGIS
+    Email                : info at naturalgis dot pt
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+
+from qgis.core import (
+    QgsProcessingException,
+    QgsProcessingParameterFile,
+    QgsProcessingParameterString,
+    QgsProcessingParameterMatrix,
+    QgsProcessingParameterFolderDestination,
+)
+
+from iadb_toolbox.algorithm import IadbAlgorithm
+from iadb_toolbox.utils import (
+    copy_inputs,
+    generate_job_files,
+    preflight_check,
+)
+
+
+class SphBatchMode(IadbAlgorithm):
+
+    PROBLEM_NAME = "PROBLEM_NAME"
+    PARAMETERS = "PARAMETERS"
+    POINTS = "POINTS"
+    DEM = "DEM"
+    OUTPUT = "OUTPUT"
+
+    PARAMETER_KEYS = (
+        "dt",
+        "time_end",
+        "print_step",
+        "cgra",
+        "dens",
+        "cmanning",
+        "eros_coef",
+        "nfrict",
+        "tauy0",
+        "visco",
+        "tanfi8",
+    )
+
+    def name(self):
+        return "sphbatchmode"
+
+    def displayName(self):
+        return self.tr("SPH model (batch mode)")
+
+    def group(self):
+        return self.tr("Modeling")
+
+    def groupId(self):
+        return "modeling"
+
+    def __init__(self):
+        super().__init__()
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(
+            QgsProcessingParameterString(self.PROBLEM_NAME, self.tr("Problem name"))
+        )
+        self.addParameter(
+            QgsProcessingParameterMatrix(
+                self.PARAMETERS,
+                self.tr("Model parameters (one run per row)"),
+                numberRows=1,
+                headers=list(self.PARAMETER_KEYS),
+            )
+        )
+        self.addParameter(
+            QgsProcessingParameterFile(self.POINTS, self.tr("Points file"), fileFilter=self.tr("PTS files (*.pts *.PTS)"))
+        )
+        self.addParameter(QgsProcessingParameterFile(self.DEM, self.tr("DEM"), fileFilter=self.tr("TOP files (*.top *.TOP)")))
+        self.addParameter(
+            QgsProcessingParameterFolderDestination(
+                self.OUTPUT, self.tr("Output folder")
+            )
+        )
+
+    def processAlgorithm(self, parameters, context, feedback):
+        problem_name = self.parameterAsString(parameters, self.PROBLEM_NAME, context)
+        matrix = self.parameterAsMatrix(parameters, self.PARAMETERS, context)
+
+        points_file = self.parameterAsFile(parameters, self.POINTS, context)
+        dem = self.parameterAsFile(parameters, self.DEM, context)
+        output = self.parameterAsString(parameters, self.OUTPUT, context)
+
+        column_count = len(self.PARAMETER_KEYS)
+        if not matrix or len(matrix) % column_count != 0:
+            raise QgsProcessingException(
+                self.tr("Parameters matrix should have {} values per row").format(
+                    column_count
+                )
+            )
+
+        preflight_check([points_file, dem], output)
+
+        runs = [
+            matrix[i : i + column_count] for i in range(0, len(matrix), column_count)
+        ]
+
+        step = 100.0 / len(runs)
+        for i, row in enumerate(runs):
+            if feedback.isCanceled():
+                break
+
+            run_name = f"{problem_name}_{i + 1}"
+            params = dict(zip(self.PARAMETER_KEYS, row))
+            params["problem_name"] = run_name
+
+            feedback.pushInfo(self.tr("Preparing inputs for {}…").format(run_name))
+            work_dir = copy_inputs(run_name, dem, points_file)
+            generate_job_files(work_dir, run_name, params)
+
+            self.run_sph(run_name, work_dir, os.path.join(output, run_name), feedback)
+
+            feedback.setProgress(int((i + 1) * step))
+
+        return {self.OUTPUT: output}
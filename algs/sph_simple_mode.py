@@ -18,25 +18,16 @@
 """
 
 import os
-import shutil
 
 from qgis.core import (
-    QgsProcessingException,
     QgsProcessingParameterFile,
     QgsProcessingParameterString,
     QgsProcessingParameterFolderDestination,
     QgsProcessingOutputFile,
 )
 
-from processing.core.ProcessingConfig import ProcessingConfig
-
 from iadb_toolbox.algorithm import IadbAlgorithm
-from iadb_toolbox.utils import (
-    generate_batch_file,
-    execute,
-    copy_inputs,
-    copy_outputs,
-)
+from iadb_toolbox.utils import copy_inputs, preflight_check
 
 
 class SphSimpleMode(IadbAlgorithm):
@@ -94,19 +85,12 @@ class SphSimpleMode(IadbAlgorithm):
         dem = self.parameterAsFile(parameters, self.DEM, context)
         output = self.parameterAsString(parameters, self.OUTPUT, context)
 
+        preflight_check([pts_file, dem, master_file, config_file], output)
+
         feedback.pushInfo(self.tr("Preparing inputs…"))
         work_dir = copy_inputs(problem_name, dem, pts_file, master_file, config_file)
-        batch_file = generate_batch_file(problem_name, work_dir)
-
-        feedback.pushInfo(self.tr("Running SPH model…"))
-        commands = ["cmd.exe", "/c", batch_file]
-        execute(commands, feedback)
-
-        feedback.pushInfo(self.tr("Copying output files…"))
-        copy_outputs(work_dir, problem_name, output)
 
-        feedback.pushInfo(self.tr("Cleanup…"))
-        shutil.rmtree(work_dir)
+        self.run_sph(problem_name, work_dir, output, feedback)
 
         return {
             self.OUTPUT: output,
@@ -25,15 +25,30 @@ from qgis.core import QgsApplication
 from iadb_toolbox.provider import IadbProvider
 from iadb_toolbox.utils import PLUGIN_ROOT
 
+# loaded translators keyed by (locale, qm file mtime), so reloading the
+# plugin within the same QGIS session does not re-parse the .qm file
+_translator_cache = {}
+
+
+def _load_translator(locale):
+    qm_path = os.path.join(PLUGIN_ROOT, "i18n", f"iadb_toolbox_{locale}.qm")
+    try:
+        key = (locale, os.stat(qm_path).st_mtime_ns)
+    except OSError:
+        return None
+
+    translator = _translator_cache.get(key)
+    if translator is None:
+        translator = QTranslator()
+        translator.load(qm_path)
+        _translator_cache[key] = translator
+    return translator
+
 
 class IadbPlugin:
     def __init__(self, iface):
-        locale = QgsApplication.locale()
-        qm_path = os.path.join(PLUGIN_ROOT, "i18n", f"iadb_toolbox_{locale}.qm")
-
-        if os.path.exists(qm_path):
-            self.translator = QTranslator()
-            self.translator.load(qm_path)
+        self.translator = _load_translator(QgsApplication.locale())
+        if self.translator is not None:
             QCoreApplication.installTranslator(self.translator)
 
         self.provider = IadbProvider()
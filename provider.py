@@ -24,13 +24,18 @@ from qgis.PyQt.QtCore import QCoreApplication
 
 from qgis.core import QgsProcessingProvider
 
-from processing.core.ProcessingConfig import ProcessingConfig, Setting
+from processing.core.ProcessingConfig import (
+    ProcessingConfig,
+    Setting,
+    settingsWatcher,
+)
 
 from iadb_toolbox.algs.dem_to_top import DemToTop
 from iadb_toolbox.algs.points_to_pts import PointsToPts
 from iadb_toolbox.algs.res_to_netcdf import ResToNetcdf
 from iadb_toolbox.algs.sph_simple_mode import SphSimpleMode
 from iadb_toolbox.algs.sph_advanced_mode import SphAdvancedMode
+from iadb_toolbox.algs.sph_batch_mode import SphBatchMode
 from iadb_toolbox.utils import PLUGIN_ROOT, SPH_EXECUTABLE, sph_executable
 
 
@@ -38,6 +43,7 @@ class IadbProvider(QgsProcessingProvider):
     def __init__(self):
         super().__init__()
         self.algs = list()
+        self._icon = None
 
     def id(self):
         return "iadb"
@@ -49,7 +55,9 @@ class IadbProvider(QgsProcessingProvider):
         return "IADB"
 
     def icon(self):
-        return QIcon(os.path.join(PLUGIN_ROOT, "icons", "iadb.svg"))
+        if self._icon is None:
+            self._icon = QIcon(os.path.join(PLUGIN_ROOT, "icons", "iadb.svg"))
+        return self._icon
 
     def load(self):
         ProcessingConfig.settingIcons[self.name()] = self.icon()
@@ -63,14 +71,17 @@ class IadbProvider(QgsProcessingProvider):
             )
         )
         ProcessingConfig.readSettings()
+        settingsWatcher.settingsChanged.connect(sph_executable.cache_clear)
         self.refreshAlgorithms()
         return True
 
     def unload(self):
+        settingsWatcher.settingsChanged.disconnect(sph_executable.cache_clear)
+        sph_executable.cache_clear()
         ProcessingConfig.removeSetting(SPH_EXECUTABLE)
 
     def loadAlgorithms(self):
-        self.algs = [DemToTop(), PointsToPts(), ResToNetcdf(), SphAdvancedMode(), SphSimpleMode()]
+        self.algs = [DemToTop(), PointsToPts(), ResToNetcdf(), SphAdvancedMode(), SphBatchMode(), SphSimpleMode()]
         for a in self.algs:
             self.addAlgorithm(a)
 
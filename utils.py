@@ -18,11 +18,15 @@
 """
 
 import os
+import re
 import math
+import mmap
 import shutil
-from itertools import groupby
-from operator import itemgetter
-from tempfile import mkdtemp
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from tempfile import gettempdir, mkdtemp
 from typing import Any
 from datetime import datetime, timedelta
 
@@ -36,16 +40,13 @@ from qgis.core import (
     Qgis,
     QgsRectangle,
     QgsMessageLog,
-    QgsRunProcess,
     QgsRasterLayer,
     QgsBlockingProcess,
     QgsProcessingFeedback,
     QgsProcessingException,
     QgsRasterFileWriter,
-    QgsRasterBlock,
     QgsProcessingFeatureSource,
     QgsFeatureRequest,
-    QgsFeature
 )
 from processing.core.ProcessingConfig import ProcessingConfig
 
@@ -53,10 +54,96 @@ from processing.core.ProcessingConfig import ProcessingConfig
 PLUGIN_ROOT = os.path.dirname(__file__)
 SPH_EXECUTABLE = "SPH_EXECUTABLE"
 
+COPY_BUFFER_SIZE = 1 << 20
 
+PROGRESS_REGEX = re.compile(rb"(\d+)\s*%")
+
+
+def _zero_copy(fd_in: int, fd_out: int, size: int):
+    """
+    Copies size bytes between two file descriptors inside the kernel using
+    copy_file_range() with sendfile() as a fallback. Raises OSError when
+    neither mechanism manages to copy all the bytes.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            offset = 0
+            while offset < size:
+                sent = os.copy_file_range(fd_in, fd_out, size - offset, offset, offset)
+                if sent == 0:
+                    break
+                offset += sent
+            if offset >= size:
+                return
+        except OSError:
+            pass
+
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(fd_out, fd_in, offset, size - offset)
+        if sent == 0:
+            break
+        offset += sent
+
+    if offset < size:
+        raise OSError("zero-copy transfer was incomplete")
+
+
+def fast_copy(src: str, dst: str):
+    """
+    Copies a file without copying its metadata, using the kernel zero-copy
+    machinery when available and a buffered userspace copy otherwise.
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        try:
+            _zero_copy(fsrc.fileno(), fdst.fileno(), size)
+            return
+        except (OSError, AttributeError):
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+
+
+def stage_file(src: str, dst: str):
+    """
+    Makes src available at dst without moving bytes when possible. The staged
+    inputs are only read by the SPH tool, so a hardlink is a safe alias;
+    falls back to a real copy when linking is not possible (e.g. src and dst
+    are on different filesystems).
+    """
+    try:
+        if os.stat(src).st_dev == os.stat(os.path.dirname(dst)).st_dev:
+            os.link(src, dst)
+            return
+    except OSError:
+        pass
+
+    fast_copy(src, dst)
+
+
+def copy_many(pairs: list[tuple[str, str]], copy=fast_copy):
+    """
+    Copies several files at once, overlapping the individual copies in a
+    thread pool. The zero-copy transfers release the GIL, so the kernel can
+    service them in parallel.
+    """
+    if not pairs:
+        return
+
+    with ThreadPoolExecutor(max_workers=len(pairs)) as executor:
+        list(executor.map(lambda pair: copy(*pair), pairs))
+
+
+@lru_cache(maxsize=1)
 def sph_executable() -> str:
     """
     Returns path to the SHP executable.
+
+    The value is cached; the provider clears the cache when the Processing
+    settings change.
     """
     filePath = ProcessingConfig.getSetting(SPH_EXECUTABLE)
     return filePath if filePath is not None else "sph24"
@@ -69,38 +156,46 @@ def execute(commands: list[str], feedback: QgsProcessingFeedback = None):
     if feedback is None:
         feedback = QgsProcessingFeedback()
 
-    fused_command = " ".join([str(c) for c in commands])
+    command = str(commands[0])
+    arguments = [str(c) for c in commands[1:]]
+
+    fused_command = " ".join([command, *arguments])
     QgsMessageLog.logMessage(fused_command, "Processing", Qgis.Info)
     feedback.pushInfo("SPH command:")
     feedback.pushCommandInfo(fused_command)
     feedback.pushInfo("SPH output:")
 
     def onStdOut(ba: bytes):
-        val = ba.data().decode("utf-8")
-        if "%" in val:
-            onStdOut.progress = int(progressRegex.search(val).group(0))
+        data = ba.data()
+        match = PROGRESS_REGEX.search(data) if b"%" in data else None
+        if match:
+            onStdOut.progress = int(match.group(1))
             feedback.setProgress(onStdOut.progress)
         else:
-            onStdOut.buffer += val
+            onStdOut.buffer += data
 
-        if onStdOut.buffer.endswith(("\n", "\r")):
-            feedback.pushConsoleInfo(onStdOut.buffer.rstrip())
-            onStdOut.buffer = ""
+        idx = max(onStdOut.buffer.rfind(b"\n"), onStdOut.buffer.rfind(b"\r"))
+        if idx >= 0:
+            feedback.pushConsoleInfo(
+                onStdOut.buffer[:idx].decode("utf-8", errors="replace").rstrip()
+            )
+            del onStdOut.buffer[: idx + 1]
 
     onStdOut.progress = 0
-    onStdOut.buffer = ""
+    onStdOut.buffer = bytearray()
 
     def onStdErr(ba: bytes):
-        val = ba.data().decode("utf-8")
-        onStdErr.buffer += val
+        onStdErr.buffer += ba.data()
 
-        if onStdErr.buffer.endswith(("\n", "\r")):
-            feedback.reportError(onStdErr.buffer.rstrip())
-            onStdErr.buffer = ""
+        idx = max(onStdErr.buffer.rfind(b"\n"), onStdErr.buffer.rfind(b"\r"))
+        if idx >= 0:
+            feedback.reportError(
+                onStdErr.buffer[:idx].decode("utf-8", errors="replace").rstrip()
+            )
+            del onStdErr.buffer[: idx + 1]
 
-    onStdErr.buffer = ""
+    onStdErr.buffer = bytearray()
 
-    command, *arguments = QgsRunProcess.splitCommand(fused_command)
     proc = QgsBlockingProcess(command, arguments)
     proc.setStdOutHandler(onStdOut)
     proc.setStdErrHandler(onStdErr)
@@ -124,85 +219,196 @@ def execute(commands: list[str], feedback: QgsProcessingFeedback = None):
 
 def generate_batch_file(problem_name: str, work_dir: str) -> str:
     """
-    Generates script to run SPH tool.
+    Generates script to run SPH tool. On Windows this is a .bat file, on
+    other platforms a shell script launching the native SPH executable.
 
     Returns a full path to the generated script.
     """
     input_file_name = "files.txt"
     input_file = os.path.join(work_dir, input_file_name)
-    with open(input_file, "w", encoding="utf-8") as f:
-        for i in range(2):
-            f.write(f"{problem_name}\n")
-
-    batch_file = os.path.join(work_dir, f"{problem_name}.bat")
-    with open(batch_file, "w", encoding="utf-8") as f:
-        f.write("set CWDIR=%~dp0\n")
-        f.write(f"cd {work_dir}\n")
-        f.write(f"SPH24.exe < {input_file_name}\n")
-        f.write("cd %WDIR%\n")
+    with open(input_file, "wb") as f:
+        f.write(f"{problem_name}\n{problem_name}\n".encode("utf-8"))
+
+    executable_name = os.path.basename(sph_executable())
+
+    if os.name == "nt":
+        batch_file = os.path.join(work_dir, f"{problem_name}.bat")
+        with open(batch_file, "wb") as f:
+            f.write(
+                (
+                    "set CWDIR=%~dp0\n"
+                    f"cd {work_dir}\n"
+                    f"{executable_name} < {input_file_name}\n"
+                    "cd %WDIR%\n"
+                ).encode("utf-8")
+            )
+    else:
+        batch_file = os.path.join(work_dir, f"{problem_name}.sh")
+        with open(batch_file, "wb") as f:
+            f.write(
+                (
+                    "#!/bin/sh\n"
+                    f'cd "{work_dir}"\n'
+                    f'"./{executable_name}" < {input_file_name}\n'
+                ).encode("utf-8")
+            )
+        os.chmod(batch_file, 0o755)
 
     return batch_file
 
 
+def sph_command(batch_file: str) -> list[str]:
+    """
+    Returns the command line used to launch the generated SPH run script.
+    """
+    if os.name == "nt":
+        return ["cmd.exe", "/c", batch_file]
+
+    return ["/bin/sh", batch_file]
+
+
+def preflight_check(inputs: list[str], output_dir: str):
+    """
+    Verifies that an SPH run has a chance to succeed before any expensive
+    staging is performed: the executable must exist, the output location must
+    be writable and there has to be enough free space for the working copies.
+
+    Raises QgsProcessingException describing the problem otherwise.
+    """
+    executable = sph_executable()
+    if shutil.which(executable) is None and not os.path.isfile(executable):
+        raise QgsProcessingException(
+            f'SPH executable "{executable}" not found. Set the path to it in the Processing options.'
+        )
+
+    parent = output_dir
+    while parent and not os.path.exists(parent):
+        parent = os.path.dirname(parent)
+    if parent and not os.access(parent, os.W_OK):
+        raise QgsProcessingException(f'Output folder "{output_dir}" is not writable.')
+
+    required = 2 * sum(os.path.getsize(i) for i in inputs if i and os.path.exists(i))
+    if shutil.disk_usage(gettempdir()).free < required:
+        raise QgsProcessingException(
+            "Not enough free disk space in the temporary directory to stage the SPH inputs."
+        )
+
+
 def copy_inputs(
     problem_name: str,
     dem: str,
     pts_file: str,
     master_file: str | None = None,
     config_file: str | None = None,
+    base_dir: str | None = None,
 ) -> str:
     """
     Copies SPH executable and input files into a separate directory to create an
     environment for performing analysis.
 
+    The working directory is created under base_dir when given (e.g. a tmpfs
+    like /dev/shm to keep the run off slow disks) and under the system temp
+    location otherwise.
+
     Returns full path to the created directory.
     """
-    work_dir = mkdtemp(prefix=f"sph-")
-
-    shutil.copy(sph_executable(), work_dir)
+    work_dir = mkdtemp(prefix="sph-", dir=base_dir)
 
-    new_path = os.path.join(work_dir, f"{problem_name}.top")
-    shutil.copyfile(dem, new_path)
+    executable = sph_executable()
+    try:
+        os.link(executable, os.path.join(work_dir, os.path.basename(executable)))
+    except OSError:
+        shutil.copy(executable, work_dir)
 
-    new_path = os.path.join(work_dir, f"{problem_name}.pts")
-    shutil.copyfile(pts_file, new_path)
+    pairs = [
+        (dem, os.path.join(work_dir, f"{problem_name}.top")),
+        (pts_file, os.path.join(work_dir, f"{problem_name}.pts")),
+    ]
 
     if master_file is not None:
-        new_path = os.path.join(work_dir, f"{problem_name}.master.dat")
-        shutil.copyfile(master_file, new_path)
+        pairs.append((master_file, os.path.join(work_dir, f"{problem_name}.master.dat")))
 
     if config_file is not None:
-        new_path = os.path.join(work_dir, f"{problem_name}.dat")
-        shutil.copyfile(config_file, new_path)
+        pairs.append((config_file, os.path.join(work_dir, f"{problem_name}.dat")))
+
+    copy_many(pairs, copy=stage_file)
 
     return work_dir
 
 
+MASTER_FILE_TEMPLATE = (
+    "1\n"
+    "{problem_name}\n"
+    "sph     gfl  Monte-Carlo\n"
+    "  1      0      0 \n"
+    "problem_type   Integ_Alg \n"
+    "       1               4\n"
+    "file.dat\n"
+    "{problem_name}\n"
+    "dt      time_end   maxtimesteps\n"
+    "{dt}      {time_end}          1000000\n"
+    "print_step   save_step  plot_step\n"
+    "   {print_step}          {print_step}       {print_step}\n"
+    "dt_sph  ic_adapt    \n"
+    "0.1      1  \n"
+    "time_curves      max_pts\n"
+    "     0              6  \n"
+    "cases_win      ic_eros\n"
+    "   0              0 \n"
+)
+
+DATA_FILE_TEMPLATE = (
+    "  1\n"
+    "{problem_name}\n"
+    "SWalg\n"
+    "  0\n"
+    "nhist\n"
+    "  0\n"
+    "ndimn\n"
+    "   2\n"
+    "soil  water  vps  ic_abs\n"
+    " 1      0     0     0\n"
+    "icunk     h_inf_SW  \n"
+    "  6         0.1\n"
+    "file.pts\n"
+    "  {problem_name}\n"
+    "pa_sph,  nnps, sle, skf \n"
+    "  2       2     1    1         \n"
+    "sum_den,  av_vel, virt_part , nor_dens  \n"
+    "   T         T      F            F       \n"
+    "cgra   dens  cmanning  eros_Coef    nfrict     Tauy0   constK  visco   tanfi8  hfrict0    c11   tanfi0   .Bfact     hrelpw   Comp  \n"
+    " {cgra}   {dens}   {cmanning}           {eros_coef}          {nfrict}         {tauy0}     0.0     {visco}    {tanfi8}    1.e-3     0.0     0.      0.0       0.0      0.001\n"
+    "K0\n"
+    "  0\n"
+    "icpwp \n"
+    "  0\n"
+    "coarse\n"
+    "  0\n"
+    "chk_pts\n"
+    "  0\n"
+    "Gid_Mask_SW   1.hs  2.disp 3.v  4.Pwb  5 eros   6.Z  7.hrel  8.hw  9.eta  10.hs+hw  11.hsat   12.Pw\n"
+    "               1      1    0    0      0        0        0       0       0     0       0          0\n"
+    "T_change_to_W\n"
+    "  1.e+12    \n"
+)
+
+
+@lru_cache(maxsize=16)
+def _render_config(template: str, items: tuple) -> str:
+    """
+    Renders a configuration file template. Parameter sweeps re-run the same
+    templates with mostly identical values, so the rendered text is memoized
+    on the (template, parameters) pair.
+    """
+    return template.format_map(dict(items))
+
+
 def generate_master_file(file_name: str, params: dict[str, Any]):
     """
     Generates configuration file with the model inputs and generic parameters.
     """
     with open(file_name, "w", encoding="utf-8") as f:
-        f.write("1\n")
-        f.write(f"{params['problem_name']}\n")
-        f.write("sph     gfl  Monte-Carlo\n")
-        f.write("  1      0      0 \n")
-        f.write("problem_type   Integ_Alg \n")
-        f.write("       1               4\n")
-        f.write("file.dat\n")
-        f.write(f"{params['problem_name']}\n")
-        f.write("dt      time_end   maxtimesteps\n")
-        f.write(f"{params['dt']}      {params['time_end']}          1000000\n")
-        f.write("print_step   save_step  plot_step\n")
-        f.write(
-            f"   {params['print_step']}          {params['print_step']}       {params['print_step']}\n"
-        )
-        f.write("dt_sph  ic_adapt    \n")
-        f.write("0.1      1  \n")
-        f.write("time_curves      max_pts\n")
-        f.write("     0              6  \n")
-        f.write("cases_win      ic_eros\n")
-        f.write("   0              0 \n")
+        f.write(_render_config(MASTER_FILE_TEMPLATE, tuple(sorted(params.items()))))
 
 
 def generate_data_file(file_name: str, params: dict[str, Any]):
@@ -210,46 +416,43 @@ def generate_data_file(file_name: str, params: dict[str, Any]):
     Generates configuration file with specific model parameters.
     """
     with open(file_name, "w", encoding="utf-8") as f:
-        f.write("  1\n")
-        f.write(f"{params['problem_name']}\n")
-        f.write("SWalg\n")
-        f.write("  0\n")
-        f.write("nhist\n")
-        f.write("  0\n")
-        f.write("ndimn\n")
-        f.write("   2\n")
-        f.write("soil  water  vps  ic_abs\n")
-        f.write(" 1      0     0     0\n")
-        f.write("icunk     h_inf_SW  \n")
-        f.write("  6         0.1\n")
-        f.write("file.pts\n")
-        f.write(f"  {params['problem_name']}\n")
-        f.write("pa_sph,  nnps, sle, skf \n")
-        f.write("  2       2     1    1         \n")
-        f.write("sum_den,  av_vel, virt_part , nor_dens  \n")
-        f.write("   T         T      F            F       \n")
-        f.write(
-            "cgra   dens  cmanning  eros_Coef    nfrict     Tauy0   constK  visco   tanfi8  hfrict0    c11   tanfi0   .Bfact     hrelpw   Comp  \n"
-        )
-        f.write(
-            f" {params['cgra']}   {params['dens']}   {params['cmanning']}           {params['eros_coef']}          {params['nfrict']}         {params['tauy0']}     0.0     {params['visco']}    {params['tanfi8']}    1.e-3     0.0     0.      0.0       0.0      0.001\n"
-        )
-        f.write("K0\n")
-        f.write("  0\n")
-        f.write("icpwp \n")
-        f.write("  0\n")
-        f.write("coarse\n")
-        f.write("  0\n")
-        f.write("chk_pts\n")
-        f.write("  0\n")
-        f.write(
-            "Gid_Mask_SW   1.hs  2.disp 3.v  4.Pwb  5 eros   6.Z  7.hrel  8.hw  9.eta  10.hs+hw  11.hsat   12.Pw\n"
-        )
-        f.write(
-            "               1      1    0    0      0        0        0       0       0     0       0          0\n"
-        )
-        f.write("T_change_to_W\n")
-        f.write("  1.e+12    \n")
+        f.write(_render_config(DATA_FILE_TEMPLATE, tuple(sorted(params.items()))))
+
+
+def generate_job_files(work_dir: str, problem_name: str, params: dict[str, Any]):
+    """
+    Generates the master and data configuration files for an SPH job in the
+    given working directory. The run script itself is produced by
+    generate_batch_file as part of the shared run phase.
+    """
+    generate_master_file(os.path.join(work_dir, f"{problem_name}.MASTER.DAT"), params)
+    generate_data_file(os.path.join(work_dir, f"{problem_name}.DAT"), params)
+
+
+QGIS_TO_NUMPY_DATA_TYPES = {
+    Qgis.DataType.Byte: numpy.uint8,
+    Qgis.DataType.Int8: numpy.int8,
+    Qgis.DataType.UInt16: numpy.uint16,
+    Qgis.DataType.Int16: numpy.int16,
+    Qgis.DataType.UInt32: numpy.uint32,
+    Qgis.DataType.Int32: numpy.int32,
+    Qgis.DataType.Float32: numpy.float32,
+    Qgis.DataType.Float64: numpy.float64,
+}
+
+
+def block_to_array(block) -> numpy.ndarray:
+    """
+    Returns contents of a QgsRasterBlock as a 2D NumPy array without copying
+    values one by one through the Python API.
+    """
+    values = numpy.frombuffer(
+        bytes(block.data()), dtype=QGIS_TO_NUMPY_DATA_TYPES[block.dataType()]
+    )
+    return values.reshape(block.height(), block.width())
+
+
+DEM_STRIP_ROWS = 256
 
 
 def dem_to_top(layer: QgsRasterLayer, file_path: str):
@@ -258,53 +461,67 @@ def dem_to_top(layer: QgsRasterLayer, file_path: str):
     required by SPH tool.
 
     The .top format is basically a raster in the XYZ format with the custom
-    header and footer.
+    header and footer. The raster is processed in strips of DEM_STRIP_ROWS
+    rows so memory use stays bounded for very large DEMs.
     """
     provider = layer.dataProvider()
     width = provider.xSize()
     height = provider.ySize()
     pixel_size = layer.rasterUnitsPerPixelX()
-    pixel_count = width * height
     extent = layer.extent()
+    x_min = extent.xMinimum()
+    x_max = extent.xMaximum()
+    y_max = extent.yMaximum()
 
+    xs = x_min + (numpy.arange(width) + 0.5) * pixel_size
     valid_count = 0
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write("ictop\n")
-        f.write("  10\n")
-        f.write("  np      deltx\n")
-        f.write(f" {pixel_count}     {pixel_size}    \n")
-        f.write("Topo_x Topo_y Topo_z\n")
-
-        for row in range(height):
-            x_min = extent.xMinimum()
-            x_max = extent.xMaximum()
-            y_min = extent.yMaximum() - row * pixel_size
-            y_max = extent.yMaximum() - (row + 1) * pixel_size
-            block_extent = QgsRectangle(x_min, y_min, x_max, y_max)
-            block = provider.block(1, block_extent, width, height, None)
-
-            for col in range(width):
-                x = extent.xMinimum() + (col + 0.5) * pixel_size
-                y = extent.yMaximum() - (row + 0.5) * pixel_size
-                if not block.isNoData(row, col):
-                    valid_count += 1
-                    f.write(f"{x}\t{y}\t{block.value(row, col)}\n")
-
-        f.write("topo_props\n")
-        f.write("  0\n")
-
-    bak_name = f"{file_path}.bak"
-    os.rename(file_path, bak_name)
-    with open(bak_name, "r", encoding="utf-8") as bak:
-        with open(file_path, "w", encoding="utf-8") as f:
-            for i, line in enumerate(bak):
-                if i == 3:
-                    f.write(f" {valid_count}     {pixel_size}    \n")
-                    continue
-                f.write(line)
-
-    os.remove(bak_name)
+    with open(file_path, "wb", buffering=COPY_BUFFER_SIZE) as f:
+        f.write(b"ictop\n")
+        f.write(b"  10\n")
+        f.write(b"  np      deltx\n")
+        # the valid pixel count is only known after all strips are read, so
+        # write a fixed-width placeholder and patch it in place at the end
+        header_offset = f.tell()
+        f.write(f" {'':>12}     {pixel_size}    \n".encode("ascii"))
+        f.write(b"Topo_x Topo_y Topo_z\n")
+
+        for row_start in range(0, height, DEM_STRIP_ROWS):
+            rows = min(DEM_STRIP_ROWS, height - row_start)
+            strip_extent = QgsRectangle(
+                x_min,
+                y_max - (row_start + rows) * pixel_size,
+                x_max,
+                y_max - row_start * pixel_size,
+            )
+            block = provider.block(1, strip_extent, width, rows, None)
+            values = block_to_array(block)
+
+            ys = y_max - (numpy.arange(row_start, row_start + rows) + 0.5) * pixel_size
+            # broadcast views instead of materialized meshgrid arrays; the
+            # masked fancy indexing below copies only the valid pixels
+            xx = numpy.broadcast_to(xs, (rows, width))
+            yy = numpy.broadcast_to(ys[:, numpy.newaxis], (rows, width))
+
+            if block.hasNoDataValue():
+                mask = ~numpy.isclose(values, block.noDataValue(), equal_nan=True)
+            else:
+                mask = ~numpy.isnan(values)
+
+            valid_count += int(mask.sum())
+
+            numpy.savetxt(
+                f,
+                numpy.column_stack([xx[mask], yy[mask], values[mask]]),
+                fmt="%.6f",
+                delimiter="\t",
+            )
+
+        f.write(b"topo_props\n")
+        f.write(b"  0\n")
+
+        f.seek(header_offset)
+        f.write(f" {valid_count:>12}     {pixel_size}    \n".encode("ascii"))
 
 
 def points_to_pts(source: QgsProcessingFeatureSource, field_name: str | None, use_z: bool, file_path: str):
@@ -324,36 +541,70 @@ def points_to_pts(source: QgsProcessingFeatureSource, field_name: str | None, us
     else:
         request.setSubsetOfAttributes([field_name], source.fields())
 
+    count = source.featureCount()
+    xs = numpy.empty(count)
+    ys = numpy.empty(count)
+    zs = numpy.empty(count)
 
-    f1 = QgsFeature()
-    r = QgsFeatureRequest([1])
-    ok = source.getFeatures(r).nextFeature(f1)
-    f2 = QgsFeature()
-    r = QgsFeatureRequest([2])
-    ok = source.getFeatures(r).nextFeature(f2)
-    dist = f1.geometry().asPoint().distance(f2.geometry().asPoint())
+    for i, ft in enumerate(source.getFeatures(request)):
+        p = ft.geometry().constGet()
+        xs[i] = p.x()
+        ys[i] = p.y()
+        zs[i] = p.z() if use_z else ft[field_name]
+
+    dist = math.hypot(xs[1] - xs[0], ys[1] - ys[0])
 
     with open(file_path, "w", encoding="utf-8") as f:
         f.write("npoin source  grid spacing  facthsml\n")
-        f.write(f"   {source.featureCount()}           {dist}      10.0    10.0       2\n")
+        f.write(f"   {count}           {dist}      10.0    10.0       2\n")
         f.write("---  X   ---------  Y   -------  h  -----\n")
 
-        for ft in source.getFeatures(request):
-            p = ft.geometry().constGet()
-            f.write(f"{p.x()}\t{p.y()}\t{p.z() if use_z else ft[field_name]}\n")
+        numpy.savetxt(f, numpy.column_stack([xs, ys, zs]), fmt="%.6f", delimiter="\t")
 
 
 def copy_outputs(work_dir: str, problem_name: str, output_dir: str):
     """
     Copies output files produced by the SPH tool to the output directory.
-    """
-    if not os.path.exists(output_dir):
-        os.mkdir(output_dir)
 
-    for suffix in ("post.msh", "post.res", "QGIS_res"):
-        output_name = os.path.join(work_dir, f"{problem_name}.{suffix}")
-        if os.path.exists(output_name):
-            shutil.copy(output_name, output_dir)
+    Files are staged into a temporary sibling directory first and published
+    with atomic renames, so other readers of the output directory never see
+    partially copied results.
+    """
+    staging_dir = f"{output_dir}.tmp.{os.getpid()}"
+    os.makedirs(staging_dir, exist_ok=True)
+
+    wanted = {f"{problem_name}.{suffix}" for suffix in ("post.msh", "post.res", "QGIS_res")}
+    pairs = [
+        (entry.path, os.path.join(staging_dir, entry.name))
+        for entry in os.scandir(work_dir)
+        if entry.name in wanted
+    ]
+
+    copy_many(pairs, copy=stage_file)
+
+    try:
+        os.replace(staging_dir, output_dir)
+    except OSError:
+        # the output directory already exists and is not empty, move the
+        # staged files into it one by one
+        os.makedirs(output_dir, exist_ok=True)
+        for _, staged in pairs:
+            os.replace(staged, os.path.join(output_dir, os.path.basename(staged)))
+        os.rmdir(staging_dir)
+
+
+def cleanup_work_dir(work_dir: str):
+    """
+    Removes the working directory in a background thread so that deleting
+    intermediate files does not delay algorithm completion once the results
+    have been copied.
+    """
+    threading.Thread(
+        target=shutil.rmtree,
+        args=(work_dir,),
+        kwargs={"ignore_errors": True},
+        daemon=True,
+    ).start()
 
 
 def res_to_netcdf(res_file: str, dem: QgsRasterLayer, output: str):
@@ -410,13 +661,17 @@ def res_to_netcdf(res_file: str, dem: QgsRasterLayer, output: str):
 
     height = ds.createVariable(
         "Height",
-        "f8",
+        "f4",
         (
             "time",
             "latitude",
             "longitude",
         ),
         fill_value=-9999,
+        zlib=True,
+        complevel=4,
+        shuffle=True,
+        chunksizes=(1, raster_height, raster_width),
     )
     height.units = "m"
     height.positive = "up"
@@ -425,108 +680,127 @@ def res_to_netcdf(res_file: str, dem: QgsRasterLayer, output: str):
 
     vx = ds.createVariable(
         "Vx",
-        "f8",
+        "f4",
         (
             "time",
             "latitude",
             "longitude",
         ),
         fill_value=-9999,
+        zlib=True,
+        complevel=4,
+        shuffle=True,
+        chunksizes=(1, raster_height, raster_width),
     )
     vx.grid_mapping = "spatial_ref"
     vx.grid_mapping_name = "latitude_longitude"
 
     vy = ds.createVariable(
         "Vy",
-        "f8",
+        "f4",
         (
             "time",
             "latitude",
             "longitude",
         ),
         fill_value=-9999,
+        zlib=True,
+        complevel=4,
+        shuffle=True,
+        chunksizes=(1, raster_height, raster_width),
     )
     vy.grid_mapping = "spatial_ref"
     vy.grid_mapping_name = "latitude_longitude"
 
     vavg = ds.createVariable(
         "Vavg",
-        "f8",
+        "f4",
         (
             "time",
             "latitude",
             "longitude",
         ),
         fill_value=-9999,
+        zlib=True,
+        complevel=4,
+        shuffle=True,
+        chunksizes=(1, raster_height, raster_width),
     )
     vavg.grid_mapping = "spatial_ref"
     vavg.grid_mapping_name = "latitude_longitude"
 
-    for row in range(raster_height):
-        y = extent.yMaximum() - (row + 0.5) * pixel_size
-        latitude[row] = y
+    x_min = extent.xMinimum()
+    y_max = extent.yMaximum()
 
-    for col in range(raster_width):
-        x = extent.xMinimum() + (col + 0.5) * pixel_size
-        longitude[col] = x
+    latitude[:] = y_max - (numpy.arange(raster_height) + 0.5) * pixel_size
+    longitude[:] = x_min + (numpy.arange(raster_width) + 0.5) * pixel_size
 
-    data = []
     dates = []
-    h = numpy.full((raster_height, raster_width), -9999)
-    v_x = numpy.full((raster_height, raster_width), -9999)
-    v_y = numpy.full((raster_height, raster_width), -9999)
-    v_avg = numpy.full((raster_height, raster_width), -9999)
     c = 0
 
-    with open(res_file) as f:
-        sph_time = None
-        prev_time = None
-        block_read = False
-
-        for line in f:
-            line = line.strip()
-            if line.startswith("time"):
-                if sph_time is not None:
-                    prev_time = sph_time
-                    block_read = True
-
-                sph_time = float(line.split()[3])
-                dates.append(date + timedelta(seconds=sph_time))
-                continue
-
-            if block_read:
-                data = sorted(data, key=itemgetter(1))
-                values = groupby(data, itemgetter(1))
-                groups = {}
-                for k, v in values:
-                    groups[k] = list(v)
-
-                for row in range(raster_height):
-                    y = truncate(extent.yMaximum() - (row + 0.5) * pixel_size, 1)
-                    if y in groups.keys():
-                        for i in groups[y]:
-                            col = math.trunc((i[0] - extent.xMinimum()) / pixel_size)
-                            h[row, col] = i[2]
-                            v_x[row, col] = i[3]
-                            v_y[row, col] = i[4]
-                            v_avg[row, col] = i[5]
-
-                c += 1
-                data[:] = []
-
-                height[c, :, :] = h
-                vx[c, :, :] = v_x
-                vy[c, :, :] = v_y
-                vavg[c, :, :] = v_avg
-
-                h = numpy.full((raster_height, raster_width), -9999)
-                v_x = numpy.full((raster_height, raster_width), -9999)
-                v_y = numpy.full((raster_height, raster_width), -9999)
-                v_avg = numpy.full((raster_height, raster_width), -9999)
-                block_read = False
-
-            values = [float(v) for v in line.split()]
-            data.append(values)
+    # scatter buffers are reused across timesteps to avoid reallocating
+    # four raster-sized arrays per block
+    h = numpy.empty((raster_height, raster_width), dtype=numpy.float32)
+    v_x = numpy.empty((raster_height, raster_width), dtype=numpy.float32)
+    v_y = numpy.empty((raster_height, raster_width), dtype=numpy.float32)
+    v_avg = numpy.empty((raster_height, raster_width), dtype=numpy.float32)
+
+    def write_block(chunk: bytes):
+        nonlocal c
+
+        if not chunk or chunk.isspace():
+            return
+
+        arr = numpy.loadtxt(BytesIO(chunk), ndmin=2)
+
+        rows = numpy.trunc((y_max - arr[:, 1]) / pixel_size).astype(numpy.int64)
+        cols = numpy.trunc((arr[:, 0] - x_min) / pixel_size).astype(numpy.int64)
+
+        h.fill(-9999)
+        v_x.fill(-9999)
+        v_y.fill(-9999)
+        v_avg.fill(-9999)
+
+        h[rows, cols] = arr[:, 2]
+        v_x[rows, cols] = arr[:, 3]
+        v_y[rows, cols] = arr[:, 4]
+        v_avg[rows, cols] = arr[:, 5]
+
+        height[c, :, :] = h
+        vx[c, :, :] = v_x
+        vy[c, :, :] = v_y
+        vavg[c, :, :] = v_avg
+        c += 1
+
+    # memory-map the .res file and cut it into per-timestep chunks at the
+    # "time" header lines, so block data never passes through the Python
+    # text layer before numpy.loadtxt parses it
+    with open(res_file, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        size = mm.size()
+
+        markers = []
+        idx = mm.find(b"time")
+        while idx != -1:
+            line_start = mm.rfind(b"\n", 0, idx) + 1
+            if not mm[line_start:idx].strip():
+                markers.append(line_start)
+            idx = mm.find(b"time", idx + 4)
+
+        prev_end = 0
+        for marker in markers:
+            write_block(mm[prev_end:marker])
+
+            header_end = mm.find(b"\n", marker)
+            if header_end == -1:
+                header_end = size
+            sph_time = float(mm[marker:header_end].split()[3])
+            dates.append(date + timedelta(seconds=sph_time))
+
+            prev_end = header_end + 1
+
+        write_block(mm[prev_end:size])
 
     time[:] = date2num(dates, units=time.units, calendar=time.calendar)
 
@@ -534,8 +808,5 @@ def res_to_netcdf(res_file: str, dem: QgsRasterLayer, output: str):
 
 
 def truncate(number: float, digits: int) -> float:
-    decimals = len(str(number).split('.')[1])
-    if decimals <= digits:
-        return number
     step = 10.0 ** digits
     return math.trunc(step * number) / step